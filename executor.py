@@ -1,10 +1,26 @@
+import json
+import os
+import tarfile
+import tempfile
+
 import numpy as np
 import tvm
 import topi
 
-from node import Node, Placeholder
+from node import Node, Placeholder, ZerosLike, OnesLikeOp
 from utils import topological_sort_lookup
 
+def feed_shapes_eq(sa, sb):
+    if (not isinstance(sa, dict)) or (not isinstance(sb, dict)):
+        return False
+    ui = set(sa.items()) ^ set(sb.items())
+    return len(ui) == 0
+
+def kernel_key(node, input_shapes):
+    # Nodes with the same op, input shapes and attributes share one kernel
+    return (type(node.op).__name__, tuple(input_shapes), node.const_attribute,
+            getattr(node, "transpose_1", None), getattr(node, "transpose_2", None))
+
 class Executor:
     
     def __init__(self, node_list, ctx=None):
@@ -45,19 +61,13 @@ class Executor:
             if node in feed_shapes:
                 continue
             input_shapes = [self.node_to_shape[n] for n in node.inputs]
-            self.node_to_compiled_func[node] = node.op.compile_func(node, input_shapes, self.tgt, self.tgt_host)
+            self.node_to_compiled_func[node] = node.op.compiled_func(node, input_shapes, self.tgt, self.tgt_host)
             
         
     def run(self, feed_dict, convert_to_numpy_ret_vals=False):
         
         node_to_val = dict()
         
-        def feed_shapes_eq(sa, sb):
-            if (not isinstance(sa, dict)) or (not isinstance(sb, dict)):
-                return False
-            ui = set(sa.items()) ^ set(sb.items())
-            return len(ui) == 0
-        
         for n, v in feed_dict.items():
             node_to_val[n] = v
         
@@ -81,4 +91,86 @@ class Executor:
         
         if (convert_to_numpy_ret_vals):
             return [node_to_val[n].asnumpy() for n in self.eval_list]
-        return [node_to_val[n] for n in self.eval_list]
\ No newline at end of file
+        return [node_to_val[n] for n in self.eval_list]
+
+    def export(self, path, feed_shapes, params=None):
+        """
+        Write the compiled graph to a single archive at `path`, loadable
+        with `runtime.load` without rebuilding or recompiling the graph.
+        `params` maps placeholder nodes to constant values baked into it.
+        """
+        params = params or dict()
+        feed_shapes = dict(feed_shapes)
+        for node, val in params.items():
+            feed_shapes[node] = tuple(val.shape)
+        
+        if (feed_shapes_eq(feed_shapes, self.feed_shapes)):
+            node_to_shape = self.node_to_shape
+            node_to_compiled_func = self.node_to_compiled_func
+        else:
+            # Plan on the side, so run() keeps the shapes and kernels it has
+            state = (self.node_to_shape, self.node_to_compiled_func)
+            try:
+                self.infer_shape(feed_shapes)
+                self.compile_funcs(feed_shapes)
+                node_to_shape = self.node_to_shape
+                node_to_compiled_func = self.node_to_compiled_func
+            finally:
+                self.node_to_shape, self.node_to_compiled_func = state
+        
+        node_to_idx = {node: i for i, node in enumerate(self.topo_order)}
+        key_to_kernel = dict()
+        kernels = list()
+        nodes = list()
+        param_vals = dict()
+        
+        for i, node in enumerate(self.topo_order):
+            entry = {
+                "op": type(node.op).__name__,
+                "desc": str(node.desc),
+                "inputs": [node_to_idx[n] for n in node.inputs],
+                "shape": [int(d) for d in node_to_shape[node]],
+            }
+            if node in params:
+                entry["kind"] = "param"
+                val = params[node]
+                param_vals[str(i)] = val.asnumpy() if hasattr(val, "asnumpy") else np.asarray(val, dtype="float32")
+            elif node in feed_shapes:
+                entry["kind"] = "feed"
+            elif isinstance(node.op, ZerosLike):
+                entry["kind"] = "zeros"
+            elif isinstance(node.op, OnesLikeOp):
+                entry["kind"] = "ones"
+            else:
+                input_shapes = [node_to_shape[n] for n in node.inputs]
+                key = kernel_key(node, input_shapes)
+                if key not in key_to_kernel:
+                    key_to_kernel[key] = len(kernels)
+                    kernels.append(node_to_compiled_func[node])
+                entry["kind"] = "kernel"
+                entry["kernel"] = key_to_kernel[key]
+                entry["args"] = node.op.kernel_inputs(node)
+            nodes.append(entry)
+        
+        feeds = [str(n.desc) for n in self.topo_order if n in feed_shapes and n not in params]
+        assert len(feeds) == len(set(feeds)), "feed placeholders need unique descs"
+        
+        plan = {
+            "target": self.tgt,
+            "dtype": "float32",
+            "nodes": nodes,
+            "outputs": [node_to_idx[n] for n in self.eval_list],
+            "num_kernels": len(kernels),
+        }
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, "plan.json"), "w") as f:
+                json.dump(plan, f)
+            np.savez(os.path.join(tmp, "params.npz"), **param_vals)
+            with tarfile.open(path, "w") as tar:
+                tar.add(os.path.join(tmp, "plan.json"), arcname="plan.json")
+                tar.add(os.path.join(tmp, "params.npz"), arcname="params.npz")
+                for k, mod in enumerate(kernels):
+                    lib = os.path.join(tmp, "kernel_%d.so" % k)
+                    mod.export_library(lib)
+                    tar.add(lib, arcname="kernel_%d.so" % k)
@@ -51,6 +51,10 @@ class BaseOp:
     def compiled_func(self, node, shapes, tgt, tgt_host):
         pass
     
+    def kernel_inputs(self, node):
+        # Indices of node.inputs passed to the compiled func by compute
+        return list(range(len(node.inputs)))
+    
     def __call__(self):
         node = Node()
         node.op = self
@@ -317,6 +321,9 @@ class BroadcastTo(BaseOp):
     def compute(self, node, vals, output, compiled_func):
         compiled_func(vals[0], output)
     
+    def kernel_inputs(self, node):
+        return [0]
+    
     def gradient(self, node, grad):
         temp1 = ReduceSumAxis()
         temp2 = ZerosLike()
@@ -1,8 +1,14 @@
+import os
+import tarfile
+import tempfile
+
 import numpy as np
+import tvm
 
 
 from node import Node
 from executor import Executor
+import runtime
 from utils import gradients, var
 
 def test_var():
@@ -17,4 +23,61 @@ def test_var():
 
     assert isinstance(y, Node)
     assert np.array_equal(y_val, x1_val)
-    assert np.array_equal(grad_x1_val, np.ones_like(x1_val))
\ No newline at end of file
+    assert np.array_equal(grad_x1_val, np.ones_like(x1_val))
+
+def test_export_load():
+    x1 = var("x1")
+    w = var("w")
+    y = (x1 + w) * 3
+
+    executor = Executor([y], ctx=tvm.cpu(0))
+    x1_val = 2 * np.ones(3, dtype="float32")
+    w_val = np.arange(3, dtype="float32")
+    feed_dict = {x1 : tvm.nd.array(x1_val), w : tvm.nd.array(w_val)}
+    executor.run(feed_dict)
+    feed_shapes = executor.feed_shapes
+    compiled_funcs = executor.node_to_compiled_func
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "graph.tar")
+        executor.export(path, {x1 : (3,)}, params={w : w_val})
+        rt = runtime.load(path)
+    y_val, = rt.run(feed_dict = {"x1" : x1_val}, convert_to_numpy_ret_vals=True)
+
+    assert np.allclose(y_val, (x1_val + w_val) * 3)
+    # Exporting leaves the executor's compiled graph alone
+    assert executor.feed_shapes is feed_shapes
+    assert executor.node_to_compiled_func is compiled_funcs
+    y_val, = executor.run(feed_dict, convert_to_numpy_ret_vals=True)
+    assert np.allclose(y_val, (x1_val + w_val) * 3)
+
+def test_load_rejects_other_target():
+    with tempfile.TemporaryDirectory() as tmp:
+        plan = os.path.join(tmp, "plan.json")
+        with open(plan, "w") as f:
+            f.write('{"target": "cuda", "dtype": "float32", "nodes": [], "outputs": [], "num_kernels": 0}')
+        params = os.path.join(tmp, "params.npz")
+        np.savez(params)
+        path = os.path.join(tmp, "graph.tar")
+        with tarfile.open(path, "w") as tar:
+            tar.add(plan, arcname="plan.json")
+            tar.add(params, arcname="params.npz")
+        try:
+            runtime.load(path, ctx=tvm.cpu(0))
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+def test_load_rejects_path_traversal():
+    with tempfile.TemporaryDirectory() as tmp:
+        evil = os.path.join(tmp, "evil.txt")
+        with open(evil, "w") as f:
+            f.write("x")
+        path = os.path.join(tmp, "graph.tar")
+        with tarfile.open(path, "w") as tar:
+            tar.add(evil, arcname="../evil.txt")
+        try:
+            runtime.load(path)
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+        assert not os.path.exists(os.path.join(os.path.dirname(tmp), "evil.txt"))
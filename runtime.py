@@ -0,0 +1,88 @@
+import json
+import os
+import tarfile
+import tempfile
+
+import numpy as np
+import tvm
+
+# Loads archives written by Executor.export. Only the tvm runtime is needed
+# here: no Node graph, no topi and no tvm.build.
+
+class Runtime:
+
+    def __init__(self, plan, kernels, params, ctx):
+        self.plan = plan
+        self.nodes = plan["nodes"]
+        self.dtype = plan["dtype"]
+        self.kernels = kernels
+        self.ctx = ctx
+        self.feeds = {n["desc"]: i for i, n in enumerate(self.nodes) if n["kind"] == "feed"}
+        self.idx_to_arr = dict()
+        for i, n in enumerate(self.nodes):
+            shape = tuple(n["shape"])
+            if n["kind"] == "param":
+                self.idx_to_arr[i] = tvm.nd.array(params[str(i)].astype(self.dtype), ctx)
+            elif n["kind"] == "zeros":
+                self.idx_to_arr[i] = tvm.nd.array(np.zeros(shape, dtype=self.dtype), ctx)
+            elif n["kind"] == "ones":
+                self.idx_to_arr[i] = tvm.nd.array(np.ones(shape, dtype=self.dtype), ctx)
+            elif n["kind"] != "feed":
+                self.idx_to_arr[i] = tvm.nd.empty(shape, dtype=self.dtype, ctx=ctx)
+
+    def run(self, feed_dict, convert_to_numpy_ret_vals=False):
+
+        idx_to_val = dict()
+
+        for name, v in feed_dict.items():
+            i = self.feeds[name]
+            assert tuple(v.shape) == tuple(self.nodes[i]["shape"]), \
+                "feed %s has shape %s, artifact expects %s" % (name, v.shape, self.nodes[i]["shape"])
+            if isinstance(v, np.ndarray):
+                v = tvm.nd.array(v.astype(self.dtype), self.ctx)
+            idx_to_val[i] = v
+
+        for i, n in enumerate(self.nodes):
+            if i in idx_to_val:
+                continue
+            kind = n["kind"]
+            node_val = self.idx_to_arr[i]
+            if kind == "kernel":
+                args = [idx_to_val[n["inputs"][a]] for a in n["args"]]
+                self.kernels[n["kernel"]](*args, node_val)
+            elif kind == "feed":
+                raise KeyError("missing feed: %s" % n["desc"])
+            idx_to_val[i] = node_val
+
+        if (convert_to_numpy_ret_vals):
+            return [idx_to_val[i].asnumpy() for i in self.plan["outputs"]]
+        return [idx_to_val[i] for i in self.plan["outputs"]]
+
+def checked_members(tar):
+    # Only the flat, regular files Executor.export writes; anything else
+    # (links, directories, absolute or ../ paths) is rejected
+    for member in tar.getmembers():
+        name = member.name
+        if not member.isfile() or os.path.basename(name) != name or name in ("", ".", ".."):
+            raise ValueError("unexpected member in artifact: %s" % name)
+        if name not in ("plan.json", "params.npz") and not (name.startswith("kernel_") and name.endswith(".so")):
+            raise ValueError("unexpected member in artifact: %s" % name)
+        yield member
+
+def load(path, ctx=None):
+    if ctx is None:
+        ctx = tvm.cpu(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        with tarfile.open(path, "r") as tar:
+            tar.extractall(tmp, members=checked_members(tar))
+        with open(os.path.join(tmp, "plan.json")) as f:
+            plan = json.load(f)
+        # Executor only builds for llvm, which runs on the CPU
+        if plan["target"] != "llvm" or ctx.device_type != tvm.cpu(0).device_type:
+            raise ValueError("artifact built for target %s cannot run on %s" % (plan["target"], ctx))
+        with np.load(os.path.join(tmp, "params.npz")) as data:
+            params = {k: data[k] for k in data.files}
+        # Shared objects stay mapped after their files are removed
+        kernels = [tvm.runtime.load_module(os.path.join(tmp, "kernel_%d.so" % k))
+                   for k in range(plan["num_kernels"])]
+    return Runtime(plan, kernels, params, ctx)
@@ -0,0 +1,90 @@
+#include "ops.h"
+
+Tensor Graph::relu(Tensor _input, bool _inPlace)
+{
+  Op op = model->get_or_create_activation(_input, OpBase::OP_RELU, _inPlace);
+  inEdges[op];
+  outEdges[op];
+  Edge in(_input.idx, _input.op), out(_input.idx, op);
+  inEdges[op].insert(in);
+  outEdges[_input.op].insert(out);
+  Tensor t = op.ptr->outputs[0];
+  t.op = op;
+  return t;
+}
+
+Tensor Graph::sigmoid(Tensor _input, bool _inPlace)
+{
+  Op op = model->get_or_create_activation(_input, OpBase::OP_SIGMOID, _inPlace);
+  inEdges[op];
+  outEdges[op];
+  Edge in(_input.idx, _input.op), out(_input.idx, op);
+  inEdges[op].insert(in);
+  outEdges[_input.op].insert(out);
+  Tensor t = op.ptr->outputs[0];
+  t.op = op;
+  return t;
+}
+
+Op Model::get_or_create_activation(Tensor _input, OpBase::OpType _type,
+                                   bool _inPlace)
+{
+  ActivationKey key(_input, _type, _inPlace);
+  return get_or_create_op(activation, key, _type, ACTIVATION_KEY_LENGTH,
+    [&]() {
+      return new Activation(this, _input, _type, _inPlace);
+    },
+    &Model::measure_activation_cost);
+}
+
+Activation::Activation(Model* _model, Tensor _input, OpType _type, bool _inPlace)
+: OpBase(_input, _model, _type), inPlace(_inPlace)
+{
+  assert(type == OP_RELU || type == OP_SIGMOID);
+  numOutputs = 1;
+  outputs[0] = _input;
+  outputs[0].idx = 0;
+}
+
+Activation::~Activation(void)
+{}
+
+bool Activation::get_parameter(OpParameter para, int* value)
+{
+  switch (para) {
+    case PM_OP_TYPE:
+      *value = (int) type;
+      return true;
+    case PM_NUM_INPUTS:
+      *value = numInputs;
+      return true;
+    case PM_NUM_OUTPUTS:
+      *value = numOutputs;
+      return true;
+    default:
+      return false;
+  }
+}
+
+void Activation::collect_costs(float& exe_time, float& flops,
+                               float& mem_acc, int& num_kernels)
+{
+  int outputSize = 1, inputSize = 1;
+  for (int i = 0; i < outputs[0].numDim; i++)
+    outputSize *= outputs[0].dim[i];
+  for (int i = 0; i < inputs[0].numDim; i++)
+    inputSize *= inputs[0].dim[i];
+  // cost metrics
+  exe_time += runtime;
+  flops += outputSize;
+  mem_acc += inputSize;
+  num_kernels += 1;
+}
+
+ActivationKey::ActivationKey(Tensor _input, OpBase::OpType _type, bool _inPlace)
+{
+  keys[0] = (int)(_type);
+  keys[1] = (int)(_inPlace);
+  for (int i = 0; i < MAX_DIM; i++)
+    keys[2 + i] = i < _input.numDim ? _input.dim[i] : 0;
+}
@@ -0,0 +1,76 @@
+#include "ops.h"
+
+Tensor Graph::batchnorm(Tensor _input)
+{
+  Op op = model->get_or_create_batchnorm(_input);
+  inEdges[op];
+  outEdges[op];
+  Edge in(_input.idx, _input.op), out(_input.idx, op);
+  inEdges[op].insert(in);
+  outEdges[_input.op].insert(out);
+  Tensor t = op.ptr->outputs[0];
+  t.op = op;
+  return t;
+}
+
+Op Model::get_or_create_batchnorm(Tensor _input)
+{
+  BatchNormKey key(_input);
+  return get_or_create_op(batchnorm, key, OpBase::OP_BATCHNORM, BATCHNORM_KEY_LENGTH,
+    [&]() {
+      return new BatchNorm(this, _input);
+    },
+    &Model::measure_batchnorm_cost);
+}
+
+BatchNorm::BatchNorm(Model* _model, Tensor _input)
+: OpBase(_input, _model, OP_BATCHNORM)
+{
+  assert(_input.numDim == 4);
+  numOutputs = 1;
+  outputs[0] = _input;
+  outputs[0].idx = 0;
+}
+
+BatchNorm::~BatchNorm(void)
+{}
+
+bool BatchNorm::get_parameter(OpParameter para, int* value)
+{
+  switch (para) {
+    case PM_OP_TYPE:
+      *value = (int) type;
+      return true;
+    case PM_NUM_INPUTS:
+      *value = numInputs;
+      return true;
+    case PM_NUM_OUTPUTS:
+      *value = numOutputs;
+      return true;
+    default:
+      return false;
+  }
+}
+
+void BatchNorm::collect_costs(float& exe_time, float& flops,
+                              float& mem_acc, int& num_kernels)
+{
+  int outputSize = 1, inputSize = 1;
+  for (int i = 0; i < outputs[0].numDim; i++)
+    outputSize *= outputs[0].dim[i];
+  for (int i = 0; i < inputs[0].numDim; i++)
+    inputSize *= inputs[0].dim[i];
+  // cost metrics
+  exe_time += runtime;
+  flops += outputSize * 4;
+  mem_acc += inputSize;
+  num_kernels += 1;
+}
+
+BatchNormKey::BatchNormKey(Tensor _input)
+{
+  keys[0] = _input.dim[0];
+  keys[1] = _input.dim[1];
+  keys[2] = _input.dim[2];
+  keys[3] = _input.dim[3];
+}
@@ -80,18 +80,11 @@ void Concat::collect_costs(float& exe_time, float& flops,
 Op Model::get_or_create_concat(int n, Tensor* _inputs, bool* _needCopy)
 {
   ConcatKey key(n, _inputs, _needCopy);
-  Concat* concatOp;
-  if (concat.find(key) != concat.end()) {
-    concatOp = concat[key];
-  } else {
-    concatOp = new Concat(this, n, _inputs, _needCopy);
-    measure_concat_cost(concatOp);
-    concat[key] = concatOp;
-  }
-  Op ret;
-  ret.guid = global_unique_id ++;
-  ret.ptr = concatOp;
-  return ret;
+  return get_or_create_op(concat, key, OpBase::OP_CONCAT, CONCAT_KEY_LENGTH,
+    [&]() {
+      return new Concat(this, n, _inputs, _needCopy);
+    },
+    &Model::measure_concat_cost);
 }
 
 ConcatKey::ConcatKey(int n, Tensor* _inputs, bool* _needCopy)
@@ -19,6 +19,22 @@ void Conv2D::collect_costs(float& exe_time, float& flops,
   num_kernels += 1;
 }
 
+int Conv2D::get_algo(void)
+{
+#ifdef USE_CUDNN
+  return (int) fwdAlgo;
+#else
+  return -1;
+#endif
+}
+
+void Conv2D::set_algo(int algo)
+{
+#ifdef USE_CUDNN
+  fwdAlgo = (cudnnConvolutionFwdAlgo_t) algo;
+#endif
+}
+
 Tensor Graph::conv2d(Tensor _input, int _outputC,
                      int _kernelH, int _kernelW,
                      int _strideH, int _strideW,
@@ -49,19 +65,12 @@ Op Model::get_or_create_conv2d(Tensor _input, int _outputC,
 
   Conv2DKey key(_input, _outputC, _kernelH, _kernelW,
                 _strideH, _strideW, _padH, _padW, _relu);
-  Conv2D* convOp;
-  if (conv2d.find(key) != conv2d.end()) {
-    convOp = conv2d[key];
-  } else {
-    convOp = new Conv2D(this, _input, _outputC, _kernelH, _kernelW,
+  return get_or_create_op(conv2d, key, OpBase::OP_CONV2D, CONV2D_KEY_LENGTH,
+    [&]() {
+      return new Conv2D(this, _input, _outputC, _kernelH, _kernelW,
                         _strideH, _strideW, _padH, _padW, _relu);
-    measure_conv2d_cost(convOp);
-    conv2d[key] = convOp;
-  }
-  Op ret;
-  ret.guid = global_unique_id ++;
-  ret.ptr = convOp;
-  return ret;
+    },
+    &Model::measure_conv2d_cost);
 }
 
 Conv2D::Conv2D(Model* _model, Tensor _input, int _outputC,
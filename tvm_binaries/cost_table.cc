@@ -0,0 +1,77 @@
+#include "ops.h"
+#include <algorithm>
+
+// Persistent table of measured op runtimes. Each line of the file is
+//   <num_keys> <op_type> <is_training> <key_0> ... <key_k-1> <runtime> <algo>
+// where num_keys counts op_type, is_training and the op's *Key fields, so
+// entries survive across graphs and across optimizer runs on the same
+// machine. Callers hold measureLock.
+
+static const int MAX_COST_KEY_LENGTH = 2 + std::max({
+    CONV2D_KEY_LENGTH, MATMUL_KEY_LENGTH, POOL2D_KEY_LENGTH,
+    ACTIVATION_KEY_LENGTH, BATCHNORM_KEY_LENGTH, CONCAT_KEY_LENGTH,
+    SPLIT_KEY_LENGTH, NOOP_KEY_LENGTH, ELEMENT_KEY_LENGTH});
+
+static std::vector<int> cost_key(OpBase::OpType type, bool isTraining,
+                                 const int* keys, int n)
+{
+  std::vector<int> key;
+  key.push_back((int) type);
+  key.push_back(isTraining ? 1 : 0);
+  key.insert(key.end(), keys, keys + n);
+  return key;
+}
+
+bool Model::load_cost_table(std::string file_name)
+{
+  ifstream table_fs(file_name.c_str());
+  if (!table_fs.is_open()) return false;
+  int n;
+  while (table_fs >> n) {
+    // Stop at the first malformed entry and keep what was read so far
+    if (n <= 2 || n > MAX_COST_KEY_LENGTH) break;
+    std::vector<int> key(n);
+    for (int i = 0; i < n; i++)
+      table_fs >> key[i];
+    CostEntry cost;
+    table_fs >> cost.runtime >> cost.algo;
+    if (table_fs.fail()) break;
+    costTable[key] = cost;
+  }
+  table_fs.close();
+  return true;
+}
+
+void Model::save_cost_table(std::string file_name)
+{
+  ofstream table_fs;
+  table_fs.open(file_name.c_str());
+  table_fs.precision(9);
+  std::map<std::vector<int>, CostEntry>::const_iterator it;
+  for (it = costTable.begin(); it != costTable.end(); it++) {
+    table_fs << it->first.size();
+    for (size_t i = 0; i < it->first.size(); i++)
+      table_fs << ' ' << it->first[i];
+    table_fs << ' ' << it->second.runtime << ' ' << it->second.algo << std::endl;
+  }
+  table_fs.close();
+}
+
+bool Model::lookup_cost(OpBase::OpType type, const int* keys, int n, CostEntry* cost)
+{
+  std::vector<int> key = cost_key(type, isTraining, keys, n);
+  std::map<std::vector<int>, CostEntry>::const_iterator it = costTable.find(key);
+  if (it == costTable.end()) {
+    costMisses ++;
+    return false;
+  }
+  costHits ++;
+  *cost = it->second;
+  return true;
+}
+
+void Model::record_cost(OpBase::OpType type, const int* keys, int n, const CostEntry& cost)
+{
+  std::vector<int> key = cost_key(type, isTraining, keys, n);
+  costTable[key] = cost;
+}
@@ -57,18 +57,11 @@ Op Model::get_or_create_element(OpBase::OpType type,
                                 Tensor t1, Tensor t2)
 {
   ElementKey key(t1, type);
-  Element* eleOp;
-  if (element.find(key) != element.end()) {
-    eleOp = element[key];
-  } else {
-    eleOp = new Element(this, type, t1, t2);
-    measure_element_cost(eleOp);
-    element[key] = eleOp;
-  }
-  Op ret;
-  ret.guid = global_unique_id ++;
-  ret.ptr = eleOp;
-  return ret;
+  return get_or_create_op(element, key, type, ELEMENT_KEY_LENGTH,
+    [&]() {
+      return new Element(this, type, t1, t2);
+    },
+    &Model::measure_element_cost);
 }
 
 Element::Element(Model* _model, OpType _type,
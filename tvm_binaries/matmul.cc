@@ -0,0 +1,90 @@
+#include "ops.h"
+
+Tensor Graph::matmul(Tensor _input, int _outputC,
+                     OpBase::ActiMode _actiMode)
+{
+  Op op = model->get_or_create_matmul(_input, _outputC, _actiMode);
+  inEdges[op];
+  outEdges[op];
+  Edge in(_input.idx, _input.op), out(_input.idx, op);
+  inEdges[op].insert(in);
+  outEdges[_input.op].insert(out);
+  Tensor t = op.ptr->outputs[0];
+  t.op = op;
+  return t;
+}
+
+Op Model::get_or_create_matmul(Tensor _input, int _outputC,
+                               OpBase::ActiMode _actiMode)
+{
+  MatmulKey key(_input, _outputC, _actiMode);
+  return get_or_create_op(matmul, key, OpBase::OP_MATMUL, MATMUL_KEY_LENGTH,
+    [&]() {
+      return new Matmul(this, _input, _outputC, _actiMode);
+    },
+    &Model::measure_matmul_cost);
+}
+
+Matmul::Matmul(Model* _model, Tensor _input, int _outputC,
+               ActiMode _actiMode)
+: OpBase(_input, _model, OP_MATMUL), outputC(_outputC), actiMode(_actiMode)
+{
+  assert(_input.numDim == 3);
+  numOutputs = 1;
+  outputs[0].numDim = 3;
+  outputs[0].dim[0] = _input.dim[0];
+  outputs[0].dim[1] = _input.dim[1];
+  outputs[0].dim[2] = outputC;
+  outputs[0].idx = 0;
+}
+
+Matmul::~Matmul(void)
+{}
+
+bool Matmul::get_parameter(OpParameter para, int* value)
+{
+  switch (para) {
+    case PM_OP_TYPE:
+      *value = (int) type;
+      return true;
+    case PM_NUM_INPUTS:
+      *value = numInputs;
+      return true;
+    case PM_NUM_OUTPUTS:
+      *value = numOutputs;
+      return true;
+    case PM_OUTPUT_C:
+      *value = outputC;
+      return true;
+    case PM_ACTI:
+      *value = (int) actiMode;
+      return true;
+    default:
+      return false;
+  }
+}
+
+void Matmul::collect_costs(float& exe_time, float& flops,
+                           float& mem_acc, int& num_kernels)
+{
+  int outputSize = 1, inputSize = 1;
+  for (int i = 0; i < outputs[0].numDim; i++)
+    outputSize *= outputs[0].dim[i];
+  for (int i = 0; i < inputs[0].numDim; i++)
+    inputSize *= inputs[0].dim[i];
+  // cost metrics
+  exe_time += runtime;
+  flops += outputSize * inputs[0].dim[2];
+  mem_acc += inputSize + inputs[0].dim[2] * outputC;
+  num_kernels += 1;
+}
+
+MatmulKey::MatmulKey(Tensor _input, int _outputC, OpBase::ActiMode _actiMode)
+{
+  assert(_input.numDim == 3);
+  keys[0] = _input.dim[0];
+  keys[1] = _input.dim[1];
+  keys[2] = _input.dim[2];
+  keys[3] = _outputC;
+  keys[4] = (int)(_actiMode);
+}
@@ -0,0 +1,74 @@
+#include "ops.h"
+
+// NoOp marks a graph input: each call gets its own guid, so distinct inputs
+// of the same shape stay distinct sources for edges and substitutions.
+
+Tensor Graph::noop(Tensor _input)
+{
+  Op op = model->get_or_create_noop(_input);
+  inEdges[op];
+  outEdges[op];
+  Edge in(_input.idx, _input.op), out(_input.idx, op);
+  inEdges[op].insert(in);
+  outEdges[_input.op].insert(out);
+  Tensor t = op.ptr->outputs[0];
+  t.op = op;
+  return t;
+}
+
+Op Model::get_or_create_noop(Tensor _input)
+{
+  NoopKey key(_input);
+  return get_or_create_op(noop, key, OpBase::OP_NOOP, NOOP_KEY_LENGTH,
+    [&]() {
+      return new NoOp(this, _input);
+    },
+    &Model::measure_noop_cost);
+}
+
+void Model::measure_noop_cost(NoOp* noOp)
+{
+  // Nothing runs for a NoOp, so there is nothing to measure
+  noOp->runtime = 0.0f;
+}
+
+NoOp::NoOp(Model* _model, Tensor _input)
+: OpBase(_input, _model, OP_NOOP)
+{
+  numOutputs = 1;
+  outputs[0] = _input;
+  outputs[0].idx = 0;
+}
+
+NoOp::~NoOp(void)
+{}
+
+bool NoOp::get_parameter(OpParameter para, int* value)
+{
+  switch (para) {
+    case PM_OP_TYPE:
+      *value = (int) type;
+      return true;
+    case PM_NUM_INPUTS:
+      *value = numInputs;
+      return true;
+    case PM_NUM_OUTPUTS:
+      *value = numOutputs;
+      return true;
+    default:
+      return false;
+  }
+}
+
+void NoOp::collect_costs(float& exe_time, float& flops,
+                         float& mem_acc, int& num_kernels)
+{
+  // cost metrics
+  exe_time += runtime;
+}
+
+NoopKey::NoopKey(Tensor _input)
+{
+  for (int i = 0; i < NOOP_KEY_LENGTH; i++)
+    keys[i] = i < _input.numDim ? _input.dim[i] : 0;
+}
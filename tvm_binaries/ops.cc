@@ -204,18 +204,39 @@ void Graph::export_op(ofstream &file_stream, Op &op)
 
 size_t Graph::num_in_edges(Op op)
 {
-  return inEdges[op].size();
+  // find() rather than operator[]: search threads read the same graph
+  std::map<Op, std::set<Edge, EdgeCompare>, OpCompare>::const_iterator it;
+  it = inEdges.find(op);
+  return it == inEdges.end() ? 0 : it->second.size();
 }
 
 size_t Graph::num_out_edges(Op op)
 {
-  return outEdges[op].size();
+  std::map<Op, std::set<Edge, EdgeCompare>, OpCompare>::const_iterator it;
+  it = outEdges.find(op);
+  return it == outEdges.end() ? 0 : it->second.size();
 }
 
 bool Graph::has_edge(Op src, Op dst, int idx)
 {
   Edge e(idx, src);
-  return (inEdges[dst].find(e) != inEdges[dst].end());
+  std::map<Op, std::set<Edge, EdgeCompare>, OpCompare>::const_iterator it;
+  it = inEdges.find(dst);
+  return it != inEdges.end() && it->second.find(e) != it->second.end();
+}
+
+void Graph::build_out_edges(void)
+{
+  outEdges.clear();
+  std::map<Op, std::set<Edge, EdgeCompare>, OpCompare>::const_iterator it;
+  for (it = inEdges.begin(); it != inEdges.end(); it++) {
+    outEdges[it->first];
+    std::set<Edge, EdgeCompare>::const_iterator it2;
+    for (it2 = it->second.begin(); it2 != it->second.end(); it2++) {
+      Edge out(it2->idx, it->first);
+      outEdges[it2->op].insert(out);
+    }
+  }
 }
 
 size_t Graph::hash(void)
@@ -265,6 +286,14 @@ bool Graph::check_correctness(void)
       if (!has_edge(it->first, e.op, e.idx)) okay = false;
     }
   }
+  // Every input must come from an op of this graph or from the graph inputs
+  for (it = inEdges.begin(); it != inEdges.end(); it++) {
+    std::set<Edge, EdgeCompare>::const_iterator it2;
+    for (it2 = it->second.begin(); it2 != it->second.end(); it2++) {
+      if (it2->op.guid != 0 && inEdges.find(it2->op) == inEdges.end())
+        okay = false;
+    }
+  }
   return okay;
 }
 
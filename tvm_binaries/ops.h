@@ -28,6 +28,8 @@ using namespace nvinfer1;
 #include <vector>
 #include <set>
 #include <list>
+#include <mutex>
+#include <string>
 #include <iostream>
 #include <fstream>
 using namespace std;
@@ -38,8 +40,15 @@ using namespace std;
 #define BATCH_SIZE 1
 #define MAX_TENSOR_SIZE 128 * 1024 * 1024 // 128MB
 #define REPEAT_TIMES 8
+#define CONV2D_KEY_LENGTH 12
+#define MATMUL_KEY_LENGTH 5
+#define POOL2D_KEY_LENGTH 12
+#define ACTIVATION_KEY_LENGTH 6
+#define BATCHNORM_KEY_LENGTH 4
 #define CONCAT_KEY_LENGTH (MAX_NUM_INPUTS + 5)
 #define SPLIT_KEY_LENGTH (MAX_NUM_OUTPUTS + 4)
+#define NOOP_KEY_LENGTH 4
+#define ELEMENT_KEY_LENGTH 5
 const size_t WORK_SPACE_SIZE = (size_t)2 * 1024 * 1024 * 1024; // 2GB
 typedef float DATATYPE;
 
@@ -132,6 +141,9 @@ public:
   virtual void unmap(void) = 0;
   virtual void collect_costs(float& exe_time, float& flops,
                              float& mem_acc, int& num_kernels) = 0;
+  // Backend algorithm picked while measuring, kept in the cost table
+  virtual int get_algo(void) { return -1; }
+  virtual void set_algo(int algo) {}
 public:
   Tensor inputs[MAX_NUM_INPUTS], outputs[MAX_NUM_OUTPUTS];
   int numInputs, numOutputs;
@@ -167,6 +179,7 @@ public:
   size_t num_in_edges(Op op);
   size_t num_out_edges(Op op);
   bool has_edge(Op src, Op dst, int idx);
+  void build_out_edges(void);
   size_t hash(void);
   void print(void);
   bool check_correctness(void);
@@ -197,6 +210,8 @@ public:
   void unmap(void);
   bool get_parameter(OpParameter para, int*);
   void collect_costs(float& exe_time, float& flops, float& mem_acc, int& num_kernels);
+  int get_algo(void);
+  void set_algo(int algo);
 #ifdef USE_CUDNN
   cudnnConvolutionFwdAlgo_t selectForwardAlgorithm(void);
 #endif
@@ -356,12 +371,12 @@ public:
 
 struct Conv2DKey {
   Conv2DKey(Tensor, int, int, int, int, int, int, int, bool);
-  int keys[12];
+  int keys[CONV2D_KEY_LENGTH];
 };
 
 struct Conv2DCompare {
   bool operator()(const Conv2DKey& a, const Conv2DKey& b) const {
-    for (int i = 0; i < 12; i++)
+    for (int i = 0; i < CONV2D_KEY_LENGTH; i++)
       if (a.keys[i] != b.keys[i])
         return a.keys[i] < b.keys[i];
     return false;
@@ -372,12 +387,12 @@ struct Conv2DCompare {
 //
 struct MatmulKey {
   MatmulKey(Tensor, int, OpBase::ActiMode);
-  int keys[5];
+  int keys[MATMUL_KEY_LENGTH];
 };
 
 struct MatmulCompare {
   bool operator()(const MatmulKey& a, const MatmulKey& b) const {
-    for (int i = 0; i < 5; i++)
+    for (int i = 0; i < MATMUL_KEY_LENGTH; i++)
       if (a.keys[i] != b.keys[i])
         return a.keys[i] < b.keys[i];
     return false;
@@ -387,12 +402,12 @@ struct MatmulCompare {
 
 struct Pool2DKey {
   Pool2DKey(Tensor, OpBase::OpType, int, int, int, int, int, int, bool);
-  int keys[12];
+  int keys[POOL2D_KEY_LENGTH];
 };
 
 struct Pool2DCompare {
   bool operator()(const Pool2DKey& a, const Pool2DKey& b) const {
-    for (int i = 0; i < 12; i++)
+    for (int i = 0; i < POOL2D_KEY_LENGTH; i++)
       if (a.keys[i] != b.keys[i])
         return a.keys[i] < b.keys[i];
     return false;
@@ -401,12 +416,12 @@ struct Pool2DCompare {
 
 struct ActivationKey {
   ActivationKey(Tensor, OpBase::OpType, bool);
-  int keys[6];
+  int keys[ACTIVATION_KEY_LENGTH];
 };
 
 struct ActivationCompare {
   bool operator()(const ActivationKey& a, const ActivationKey& b) const {
-    for (int i = 0; i < 6; i++)
+    for (int i = 0; i < ACTIVATION_KEY_LENGTH; i++)
       if (a.keys[i] != b.keys[i])
         return a.keys[i] < b.keys[i];
     return false;
@@ -415,12 +430,12 @@ struct ActivationCompare {
 
 struct BatchNormKey {
   BatchNormKey(Tensor);
-  int keys[4];
+  int keys[BATCHNORM_KEY_LENGTH];
 };
 
 struct BatchNormCompare {
   bool operator()(const BatchNormKey& a, const BatchNormKey& b) const {
-    for (int i = 0; i < 4; i++)
+    for (int i = 0; i < BATCHNORM_KEY_LENGTH; i++)
       if (a.keys[i] != b.keys[i])
         return a.keys[i] < b.keys[i];
     return false;
@@ -456,12 +471,12 @@ struct SplitCompare {
 };
 struct NoopKey {
   NoopKey(Tensor input);
-  int keys[4];
+  int keys[NOOP_KEY_LENGTH];
 };
 
 struct NoopCompare {
   bool operator()(const NoopKey& a, const NoopKey& b) const {
-    for (int i = 0; i < 4; i++)
+    for (int i = 0; i < NOOP_KEY_LENGTH; i++)
       if (a.keys[i] != b.keys[i])
         return a.keys[i] < b.keys[i];
     return false;
@@ -470,18 +485,25 @@ struct NoopCompare {
 
 struct ElementKey {
   ElementKey(Tensor t, OpBase::OpType type);
-  int keys[5];
+  int keys[ELEMENT_KEY_LENGTH];
 };
 
 struct ElementCompare {
   bool operator()(const ElementKey& a, const ElementKey& b) const {
-    for (int i = 0; i < 5; i++)
+    for (int i = 0; i < ELEMENT_KEY_LENGTH; i++)
       if (a.keys[i] != b.keys[i])
         return a.keys[i] < b.keys[i];
     return false;
   };
 };
 
+// Persisted result of measuring one op configuration
+struct CostEntry {
+  CostEntry(void) : runtime(0.0f), algo(-1) {}
+  float runtime;
+  int algo; // backend algorithm picked while measuring (e.g. cuDNN fwdAlgo), -1 if none
+};
+
 class Model {
 public:
   Model(bool);
@@ -510,8 +532,66 @@ public:
   void measure_concat_cost(Concat*);
   void measure_split_cost(Split*);
   void measure_element_cost(Element*);
+  void measure_noop_cost(NoOp*);
   void* allocate_memory(size_t size);
   float measure_oplist_runtime(const std::vector<OpBase*>& list);
+  bool load_cost_table(std::string file_name);
+  void save_cost_table(std::string file_name);
+  bool lookup_cost(OpBase::OpType type, const int* keys, int n, CostEntry* cost);
+  void record_cost(OpBase::OpType type, const int* keys, int n, const CostEntry& cost);
+  // Returns an Op for the memoized operator under `key`. The first time a
+  // key is seen the op is created and costed, from the cost table if it has
+  // an entry for {type, key} and otherwise by measure(), which is then
+  // recorded. Safe to call from several search threads: the op maps are
+  // guarded by `lock`, while costing runs under `measureLock` only, so
+  // lookups are never blocked by a measurement.
+  template<typename T, typename Key, typename Compare, typename Create>
+  Op get_or_create_op(std::map<Key, T*, Compare>& ops, const Key& key,
+                      OpBase::OpType type, int keyLength,
+                      Create create, void (Model::*measure)(T*))
+  {
+    T* opPtr = NULL;
+    {
+      std::lock_guard<std::mutex> guard(lock);
+      if (ops.find(key) != ops.end()) {
+        opPtr = ops[key];
+        opHits ++;
+      }
+    }
+    if (opPtr == NULL) {
+      std::lock_guard<std::mutex> measureGuard(measureLock);
+      {
+        // Another thread may have costed this key while we waited
+        std::lock_guard<std::mutex> guard(lock);
+        if (ops.find(key) != ops.end()) {
+          opPtr = ops[key];
+          opHits ++;
+        }
+      }
+      if (opPtr == NULL) {
+        opPtr = create();
+        CostEntry cost;
+        if (lookup_cost(type, key.keys, keyLength, &cost)) {
+          opPtr->runtime = cost.runtime;
+          opPtr->set_algo(cost.algo);
+        } else {
+          (this->*measure)(opPtr);
+          cost.runtime = opPtr->runtime;
+          cost.algo = opPtr->get_algo();
+          record_cost(type, key.keys, keyLength, cost);
+        }
+        std::lock_guard<std::mutex> guard(lock);
+        ops[key] = opPtr;
+      }
+    }
+    Op ret;
+    {
+      std::lock_guard<std::mutex> guard(lock);
+      ret.guid = global_unique_id ++;
+    }
+    ret.ptr = opPtr;
+    return ret;
+  }
 public:
   bool isTraining;
   size_t global_unique_id;
@@ -540,6 +620,15 @@ public:
   std::map<ElementKey, Element*, ElementCompare> element;
   DATATYPE *inputPtr, *biasPtr, *outputPtr, *filterPtr;
   DATATYPE *scalePtr, *runningMean, *runningVar, *saveMean, *saveVar;
+  // Measured op costs keyed by {OpType, isTraining, op key}, persisted
+  // across runs
+  std::map<std::vector<int>, CostEntry> costTable;
+  // opHits: reuse of an op already in the maps above; costHits: new op
+  // costed from costTable; costMisses: new op that had to be measured
+  size_t opHits = 0, costHits = 0, costMisses = 0;
+  // `lock` guards the op maps and global_unique_id; `measureLock` serializes
+  // costing, since measurements share the buffers and handles above
+  std::mutex lock, measureLock;
 };
 
 #endif
@@ -1,63 +1,10 @@
 
 #include "ops.h"
+#include "substitution.h"
 #include "squeezenet.h"
 #include "resnet.h"
 #include <cstring> 
 
-Graph* optimize_graph(Graph *graph, Model *model, float beta)
-{
-  std::vector<GraphXfer*> xfers;
-  xfers.push_back(create_fuse_conv_batch_xfer(model));
-  xfers.push_back(create_fuse_mm_acti_xfer(model));
-  xfers.push_back(create_fuse_conv_relu_xfer(model));
-  xfers.push_back(create_merge_mm_xfer(model));
-  xfers.push_back(create_merge_conv_xfer(model));
-  xfers.push_back(create_exclusive_concat_xfer(model));
-  xfers.push_back(create_resnet_merge_xfer(model));
-
-  std::priority_queue<Graph*, std::vector<Graph*>, GraphCompare> candidates;
-  std::set<size_t> hashmap;
-  candidates.push(graph);
-  hashmap.insert(graph->hash());
-  Graph *bestGraph = graph;
-  float bestCost = graph->total_cost();
-  printf("Baseline Graph:\n    End-to-end runtime = %.4lfms\n", graph->run(model));
-  graph->print_costs();
-
-  int counter = 0;
-  bool firstGraph = true;
-  std::map<Edge, int, EdgeCompare> edgeWeights;
-  while (!candidates.empty()) {
-    Graph *subGraph = candidates.top();
-    candidates.pop();
-    if (subGraph->total_cost() < bestCost) {
-      delete bestGraph;
-      bestCost = subGraph->total_cost();
-      bestGraph = subGraph;
-    }
-    if (subGraph->total_cost() > beta * bestCost) {
-      delete subGraph;
-      continue;
-    }
-#ifdef VERBOSE
-    if (counter % 100 == 0)
-      printf("[%d] cost = %.4lf bestCost = %.4lf candidates.size() = %zu\n", counter, subGraph->total_cost(), bestCost, candidates.size());
-#endif
-    counter ++;
-    for (int i = 0; i < xfers.size(); i++)
-      xfers[i]->run(0, subGraph, candidates, hashmap, bestCost * beta, edgeWeights, firstGraph);
-    firstGraph = false;
-    if (bestGraph != subGraph) {
-      delete subGraph;
-    }
-  }
-  printf("Optimized Graph:\n    End-to-end runtime = %.4lfms\n", bestGraph->run(model));
-  bestGraph->print_costs();
-
-  GraphXfer::print_edge_weights(edgeWeights);
-  return bestGraph;
-}
-
 enum DNNModel {
   None,
   SqueezeNet,
@@ -79,7 +26,9 @@ void parse_args(bool &optimize,
                 bool &export_graph,
                 float &beta,
                 int &budget,
+                int &num_threads,
                 std::string &export_file_name,
+                std::string &cost_file_name,
                 DNNModel &dnnModel,
                 int argc,
                 char **argv)
@@ -95,6 +44,14 @@ void parse_args(bool &optimize,
       budget = std::atoi(argv[++i]);
       continue;
     }
+    if (!strcmp(argv[i], "--threads")) {
+      num_threads = std::atoi(argv[++i]);
+      continue;
+    }
+    if (!strcmp(argv[i], "--costs")) {
+      cost_file_name = argv[++i];
+      continue;
+    }
     if (!strcmp(argv[i],"--export")) {
       export_graph = true;
       export_file_name = argv[++i];
@@ -120,14 +77,19 @@ int main(int argc, char **argv)
   bool optimize = true;
   bool export_graph = false;
   int budget = 300; 
+  int num_threads = 0;
   float beta = 1.01;
   DNNModel dnn = None;
   std::string export_file_name;
-  parse_args(optimize, export_graph, beta, budget, export_file_name, dnn, argc, argv);
+  std::string cost_file_name;
+  parse_args(optimize, export_graph, beta, budget, num_threads, export_file_name,
+             cost_file_name, dnn, argc, argv);
   assert(dnn != None);
   printf("DnnModel(%d) beta(%.4lf)\n", dnn, beta);
 
   Model* model = new Model(false);
+  if (cost_file_name.size() > 0)
+    model->load_cost_table(cost_file_name);
   Graph* graph = NULL;
   switch (dnn) {
     case SqueezeNet:
@@ -157,7 +119,11 @@ int main(int argc, char **argv)
     printf("    End-to-end runtime = %.4lf\n", graph->run(model));
     graph->print_costs();
   } else if (optimize) {
-    graph = optimize_graph(graph, model, beta, budget);
+    graph = optimize_graph(graph, model, beta, budget, num_threads);
+  }
+  if (cost_file_name.size() > 0)
+  {
+    model->save_cost_table(cost_file_name);
   }
   if (export_graph)
   {
@@ -10,19 +10,12 @@ Op Model::get_or_create_pool2d(Tensor _input, OpBase::OpType _type,
 
   Pool2DKey key(_input, _type, _kernelH, _kernelW, _strideH, _strideW,
                 _padH, _padW, _relu);
-  Pool2D* poolOp;
-  if (pool2d.find(key) != pool2d.end()) {
-    poolOp = pool2d[key];
-  } else {
-    poolOp = new Pool2D(this, _input, _type, _kernelH, _kernelW,
+  return get_or_create_op(pool2d, key, _type, POOL2D_KEY_LENGTH,
+    [&]() {
+      return new Pool2D(this, _input, _type, _kernelH, _kernelW,
                         _strideH, _strideW, _padH, _padW, _relu);
-    measure_pool2d_cost(poolOp);
-    pool2d[key] = poolOp;
-  }
-  Op ret;
-  ret.guid = global_unique_id ++;
-  ret.ptr = poolOp;
-  return ret;
+    },
+    &Model::measure_pool2d_cost);
 }
 
 Tensor Graph::pool2d_max(Tensor _input,
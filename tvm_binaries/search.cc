@@ -0,0 +1,187 @@
+#include "substitution.h"
+#include <chrono>
+#include <condition_variable>
+#include <thread>
+
+typedef std::priority_queue<Graph*, std::vector<Graph*>, GraphCompare> GraphQueue;
+
+static double elapsed_ms(std::chrono::steady_clock::time_point start)
+{
+  std::chrono::duration<double, std::milli> d = std::chrono::steady_clock::now() - start;
+  return d.count();
+}
+
+// Worker threads that live for the whole search. Worker t owns xfers
+// t, t + numThreads, ...; a GraphXfer keeps its match state in its
+// SrcOps/DstOps, so each xfer is only ever run by one thread. expand() hands
+// every worker the same graph and returns once all of them are done. New
+// graphs are claimed in the shared hashmap as they are found, and collected
+// in per-worker queues and edge weights for the caller to merge.
+class XferPool {
+public:
+  XferPool(std::vector<GraphXfer*>& _xfers, int _numThreads, std::set<size_t>& _hashmap);
+  ~XferPool(void);
+  void expand(Graph* _graph, float _threshold, bool _collectEdgeWeights);
+public:
+  std::vector<GraphQueue> found;
+  std::vector<std::map<Edge, int, EdgeCompare> > weights;
+private:
+  void work(int t);
+  std::vector<GraphXfer*>& xfers;
+  int numThreads;
+  std::set<size_t>& hashmap;
+  std::mutex hashLock, mutex;
+  std::condition_variable start, done;
+  std::vector<std::thread> workers;
+  Graph* graph;
+  float threshold;
+  bool collectEdgeWeights, stop;
+  size_t generation;
+  int pending;
+};
+
+XferPool::XferPool(std::vector<GraphXfer*>& _xfers, int _numThreads, std::set<size_t>& _hashmap)
+: found(_numThreads), weights(_numThreads), xfers(_xfers), numThreads(_numThreads),
+  hashmap(_hashmap), graph(NULL), threshold(0.0f), collectEdgeWeights(false),
+  stop(false), generation(0), pending(0)
+{
+  for (int t = 0; t < numThreads; t++)
+    workers.push_back(std::thread(&XferPool::work, this, t));
+}
+
+XferPool::~XferPool(void)
+{
+  {
+    std::lock_guard<std::mutex> guard(mutex);
+    stop = true;
+  }
+  start.notify_all();
+  for (size_t t = 0; t < workers.size(); t++)
+    workers[t].join();
+}
+
+void XferPool::expand(Graph* _graph, float _threshold, bool _collectEdgeWeights)
+{
+  std::unique_lock<std::mutex> guard(mutex);
+  graph = _graph;
+  threshold = _threshold;
+  collectEdgeWeights = _collectEdgeWeights;
+  pending = numThreads;
+  generation ++;
+  start.notify_all();
+  done.wait(guard, [this]() { return pending == 0; });
+}
+
+void XferPool::work(int t)
+{
+  size_t seen = 0;
+  while (true) {
+    {
+      std::unique_lock<std::mutex> guard(mutex);
+      start.wait(guard, [&]() { return stop || generation != seen; });
+      if (stop) return;
+      seen = generation;
+    }
+    for (size_t i = t; i < xfers.size(); i += numThreads)
+      xfers[i]->run(0, graph, found[t], hashmap, threshold, weights[t],
+                    collectEdgeWeights, &hashLock);
+    {
+      std::lock_guard<std::mutex> guard(mutex);
+      if (--pending == 0) done.notify_one();
+    }
+  }
+}
+
+Graph* optimize_graph(Graph *graph, Model *model, float beta, int budget,
+                      int numThreads, SearchStats *stats)
+{
+  std::vector<GraphXfer*> xfers;
+  xfers.push_back(create_fuse_conv_batch_xfer(model));
+  xfers.push_back(create_fuse_mm_acti_xfer(model));
+  xfers.push_back(create_fuse_conv_relu_xfer(model));
+  xfers.push_back(create_merge_mm_xfer(model));
+  xfers.push_back(create_merge_conv_xfer(model));
+  xfers.push_back(create_exclusive_concat_xfer(model));
+  xfers.push_back(create_resnet_merge_xfer(model));
+
+  if (numThreads <= 0) numThreads = std::thread::hardware_concurrency();
+  if (numThreads <= 0) numThreads = 1;
+  if (numThreads > (int) xfers.size()) numThreads = xfers.size();
+
+  SearchStats localStats;
+  if (stats == NULL) stats = &localStats;
+  size_t opHitsBefore = model->opHits;
+  size_t hitsBefore = model->costHits, missesBefore = model->costMisses;
+  std::chrono::steady_clock::time_point start = std::chrono::steady_clock::now();
+
+  GraphQueue candidates;
+  std::set<size_t> hashmap;
+  candidates.push(graph);
+  hashmap.insert(graph->hash());
+  Graph *bestGraph = graph;
+  float bestCost = graph->total_cost();
+  stats->baselineCost = bestCost;
+  printf("Baseline Graph:\n    End-to-end runtime = %.4lfms\n", graph->run(model));
+  graph->print_costs();
+
+  XferPool pool(xfers, numThreads, hashmap);
+  int counter = 0;
+  bool firstGraph = true;
+  std::map<Edge, int, EdgeCompare> edgeWeights;
+  while (!candidates.empty() && (budget <= 0 || counter < budget)) {
+    Graph *subGraph = candidates.top();
+    candidates.pop();
+    if (subGraph->total_cost() < bestCost) {
+      delete bestGraph;
+      bestCost = subGraph->total_cost();
+      bestGraph = subGraph;
+      stats->timeToBest = elapsed_ms(start);
+    }
+    if (subGraph->total_cost() > beta * bestCost) {
+      delete subGraph;
+      continue;
+    }
+#ifdef VERBOSE
+    if (counter % 100 == 0)
+      printf("[%d] cost = %.4lf bestCost = %.4lf candidates.size() = %zu\n", counter, subGraph->total_cost(), bestCost, candidates.size());
+#endif
+    counter ++;
+    pool.expand(subGraph, bestCost * beta, firstGraph);
+    for (int t = 0; t < numThreads; t++) {
+      std::map<Edge, int, EdgeCompare>::const_iterator it;
+      for (it = pool.weights[t].begin(); it != pool.weights[t].end(); it++)
+        edgeWeights[it->first] += it->second;
+      pool.weights[t].clear();
+      while (!pool.found[t].empty()) {
+        candidates.push(pool.found[t].top());
+        pool.found[t].pop();
+      }
+    }
+    firstGraph = false;
+    if (bestGraph != subGraph) {
+      delete subGraph;
+    }
+  }
+  while (!candidates.empty()) {
+    delete candidates.top();
+    candidates.pop();
+  }
+
+  stats->graphsExplored = counter;
+  for (size_t i = 0; i < xfers.size(); i++) {
+    stats->graphsGenerated += xfers[i]->numGenerated;
+    stats->graphsDuplicated += xfers[i]->numDuplicated;
+  }
+  stats->opHits = model->opHits - opHitsBefore;
+  stats->costHits = model->costHits - hitsBefore;
+  stats->costMisses = model->costMisses - missesBefore;
+  stats->bestCost = bestCost;
+  stats->totalTime = elapsed_ms(start);
+
+  printf("Optimized Graph:\n    End-to-end runtime = %.4lfms\n", bestGraph->run(model));
+  bestGraph->print_costs();
+  stats->print();
+
+  GraphXfer::print_edge_weights(edgeWeights);
+  return bestGraph;
+}
@@ -29,19 +29,11 @@ void Graph::split(Tensor _input, int c1, int c2, Tensor* outputs)
 Op Model::get_or_create_split(Tensor _input, int n, int* channels)
 {
   SplitKey key(_input, n, channels);
-  Split* splitOp;
-  if (split.find(key) != split.end()) {
-    splitOp = split[key];
-  } 
-  else {
-    splitOp = new Split(this, _input, n, channels);
-    measure_split_cost(splitOp);
-    split[key] = splitOp;
-  }
-  Op ret;
-  ret.guid = global_unique_id ++;
-  ret.ptr = splitOp;
-  return ret;
+  return get_or_create_op(split, key, OpBase::OP_SPLIT, SPLIT_KEY_LENGTH,
+    [&]() {
+      return new Split(this, _input, n, channels);
+    },
+    &Model::measure_split_cost);
 }
 
 Split::Split(Model* _model, Tensor _input, int n, int* _channels)
@@ -98,6 +90,13 @@ void Split::unmap(void)
 void Split::forward(void)
 {}
 
+void Split::collect_costs(float& exe_time, float& flops,
+                          float& mem_acc, int& num_kernels)
+{
+  // Outputs alias the input, so a split does no work
+  exe_time += runtime;
+}
+
 void Model::measure_split_cost(Split* split)
 {
   split->runtime = 0;
@@ -79,7 +79,7 @@ DstEdge::DstEdge(int _idx, DstOp* _op)
 {}
 
 GraphXfer::GraphXfer(Model* _model)
-: model(_model)
+: model(_model), numGenerated(0), numDuplicated(0)
 {}
 
 void GraphXfer::add_src_op(SrcOp* src)
@@ -141,7 +141,8 @@ void GraphXfer::run(int depth, Graph* graph,
                     std::priority_queue<Graph*, std::vector<Graph*>, GraphCompare>& candidates,
                     std::set<size_t>& hashmap, float threshold,
                     std::map<Edge, int, EdgeCompare>& edgeWeights,
-                    bool collectEdgeWeights)
+                    bool collectEdgeWeights,
+                    std::mutex* hashLock)
 {
   if (depth >= srcOps.size()) {
     bool pass = true;
@@ -186,11 +187,23 @@ void GraphXfer::run(int depth, Graph* graph,
     }
     if (pass) {
       Graph* newGraph = create_new_graph(graph);
-      assert(newGraph->check_correctness());
       if (newGraph->total_cost() < threshold) {
-        if (hashmap.find(newGraph->hash()) == hashmap.end()) {
-          hashmap.insert(newGraph->hash());
+        numGenerated ++;
+        size_t hash = newGraph->hash();
+        bool isNew;
+        if (hashLock != NULL) {
+          std::lock_guard<std::mutex> guard(*hashLock);
+          isNew = hashmap.insert(hash).second;
+        } else {
+          isNew = hashmap.insert(hash).second;
+        }
+        if (isNew) {
+          newGraph->build_out_edges();
+          assert(newGraph->check_correctness());
           candidates.push(newGraph);
+        } else {
+          numDuplicated ++;
+          delete newGraph;
         }
       } else {
         delete newGraph;
@@ -222,7 +235,7 @@ void GraphXfer::run(int depth, Graph* graph,
         if (pass) {
           srcOp->mapOp = op;
           mapped.insert(op);
-          run(depth + 1, graph, candidates, hashmap, threshold, edgeWeights, collectEdgeWeights);
+          run(depth + 1, graph, candidates, hashmap, threshold, edgeWeights, collectEdgeWeights, hashLock);
           mapped.erase(op);
           srcOp->mapOp.guid = 0;
           srcOp->mapOp.ptr = NULL;
@@ -232,6 +245,8 @@ void GraphXfer::run(int depth, Graph* graph,
   }
 }
 
+// Only fills newGraph->inEdges, which is all hash() and total_cost() need;
+// callers run build_out_edges() once the graph is known to be new
 Graph* GraphXfer::create_new_graph(Graph* graph)
 {
   Graph* newGraph = new Graph(graph->model);
@@ -240,13 +255,11 @@ Graph* GraphXfer::create_new_graph(Graph* graph)
   for (opIt = graph->inEdges.begin(); opIt != graph->inEdges.end(); opIt++)
     if (mapped.find(opIt->first) == mapped.end()) {
       newGraph->inEdges[opIt->first];
-      newGraph->outEdges[opIt->first];
     }
   for (dstIt = dstOps.begin(); dstIt != dstOps.end(); dstIt ++) {
     DstOp* dstOp = *dstIt;
     dstOp->mapOp = dstOp->create_operator(graph->model);
     newGraph->inEdges[dstOp->mapOp];
-    newGraph->outEdges[dstOp->mapOp];
   }
   for (opIt = graph->inEdges.begin(); opIt != graph->inEdges.end(); opIt++)
     if (mapped.find(opIt->first) != mapped.end()) {
@@ -261,9 +274,8 @@ Graph* GraphXfer::create_new_graph(Graph* graph)
           assert(i < srcOps.size());
           assert(srcOps[i]->mapInput != NULL);
           Op op = srcOps[i]->mapInput->mapOp;
-          Edge in(it->idx, it->op), out(it->idx, op);
+          Edge in(it->idx, it->op);
           newGraph->inEdges[op].insert(in);
-          newGraph->outEdges[it->op].insert(out);
         }
     } else {
       std::set<Edge, EdgeCompare> list = opIt->second;
@@ -276,13 +288,11 @@ Graph* GraphXfer::create_new_graph(Graph* graph)
           assert(i < srcOps.size());
           assert(srcOps[i]->mapOutput != NULL);
           Op op = srcOps[i]->mapOutput->mapOp;
-          Edge in(it->idx, op), out(it->idx, opIt->first);
+          Edge in(it->idx, op);
           newGraph->inEdges[opIt->first].insert(in);
-          newGraph->outEdges[op].insert(out);
         } else {
-          Edge in(it->idx, it->op), out(it->idx, opIt->first);
+          Edge in(it->idx, it->op);
           newGraph->inEdges[opIt->first].insert(in);
-          newGraph->outEdges[it->op].insert(out);
         }
     }
   std::map<DstOp*, std::set<DstEdge, DstEdgeCompare> >::iterator dstOpIt;
@@ -291,9 +301,8 @@ Graph* GraphXfer::create_new_graph(Graph* graph)
     std::set<DstEdge, DstEdgeCompare>::const_iterator it;
     for (it = list.begin(); it != list.end(); it++) {
       Op src = it->op->mapOp, dst = dstOpIt->first->mapOp;
-      Edge in(it->idx, src), out(it->idx, dst);
+      Edge in(it->idx, src);
       newGraph->inEdges[dst].insert(in);
-      newGraph->outEdges[src].insert(out);
     }
   }
   return newGraph;
@@ -307,3 +316,29 @@ void GraphXfer::print_edge_weights(const std::map<Edge, int, EdgeCompare>& edgeW
            it->first.op.guid, it->first.idx, it->second);
   }
 }
+
+SearchStats::SearchStats(void)
+: graphsExplored(0), graphsGenerated(0), graphsDuplicated(0),
+  opHits(0), costHits(0), costMisses(0), baselineCost(0.0f), bestCost(0.0f),
+  timeToBest(0.0), totalTime(0.0)
+{}
+
+// Share of op requests served without measuring, either by an op already in
+// the model's maps or by the persisted cost table
+float SearchStats::cost_hit_rate(void) const
+{
+  size_t total = opHits + costHits + costMisses;
+  if (total == 0) return 0.0f;
+  return (float) (opHits + costHits) / total;
+}
+
+void SearchStats::print(void) const
+{
+  printf("Search stats:\n");
+  printf("    Graphs explored = %zu generated = %zu duplicated = %zu\n",
+         graphsExplored, graphsGenerated, graphsDuplicated);
+  printf("    Op reuse = %zu cost table hits = %zu measured = %zu hit rate = %.2lf%%\n",
+         opHits, costHits, costMisses, cost_hit_rate() * 100);
+  printf("    Cost %.4lfms -> %.4lfms, time to best = %.1lfms total = %.1lfms\n",
+         baselineCost, bestCost, timeToBest, totalTime);
+}
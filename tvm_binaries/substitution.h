@@ -87,6 +87,16 @@ public:
   }
 };
 
+struct SearchStats {
+  SearchStats(void);
+  size_t graphsExplored, graphsGenerated, graphsDuplicated;
+  size_t opHits, costHits, costMisses;
+  float baselineCost, bestCost;
+  double timeToBest, totalTime; // ms
+  float cost_hit_rate(void) const;
+  void print(void) const;
+};
+
 class GraphXfer {
 public:
   GraphXfer(Model* _model);
@@ -102,7 +112,8 @@ public:
            std::priority_queue<Graph*, std::vector<Graph*>, GraphCompare>&,
            std::set<size_t>&, float threshold,
            std::map<Edge, int, EdgeCompare>& edgeWeights,
-           bool collectEdgeWeights = false);
+           bool collectEdgeWeights = false,
+           std::mutex* hashLock = NULL);
   Graph* create_new_graph(Graph* graph);
   static void print_edge_weights(const std::map<Edge, int, EdgeCompare>& edgeWeights);
 public:
@@ -113,6 +124,19 @@ public:
   std::set<Op, OpCompare> mapped;
   std::vector<SrcOp*> srcOps;
   std::vector<DstOp*> dstOps;
+  // Graphs under the cost threshold, and how many of them were already seen
+  size_t numGenerated, numDuplicated;
 };
 
+GraphXfer* create_fuse_conv_batch_xfer(Model* model);
+GraphXfer* create_fuse_mm_acti_xfer(Model* model);
+GraphXfer* create_fuse_conv_relu_xfer(Model* model);
+GraphXfer* create_merge_mm_xfer(Model* model);
+GraphXfer* create_merge_conv_xfer(Model* model);
+GraphXfer* create_exclusive_concat_xfer(Model* model);
+GraphXfer* create_resnet_merge_xfer(Model* model);
+
+Graph* optimize_graph(Graph *graph, Model *model, float beta, int budget,
+                      int numThreads = 0, SearchStats *stats = NULL);
+
 #endif
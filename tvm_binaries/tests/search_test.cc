@@ -0,0 +1,242 @@
+// Tests for the cost table and the substitution search. The op backends are
+// replaced by a stub that derives each op's runtime from its output size, so
+// this builds without cuDNN or MKL; see ../README.md.
+
+#include "../substitution.h"
+#include <cstdio>
+#include <cstdlib>
+#include <unistd.h>
+
+#define CHECK(cond)                                                   \
+  do {                                                                \
+    if (!(cond)) {                                                    \
+      fprintf(stderr, "%s:%d: CHECK(%s) failed\n", __FILE__, __LINE__, #cond); \
+      exit(1);                                                        \
+    }                                                                 \
+  } while (0)
+
+// ---- stub backend ----
+
+static int numMeasured = 0;
+
+Model::Model(bool training)
+: isTraining(training), global_unique_id(100), workSpaceSize(0), workSpace(NULL)
+{}
+
+static void stub_measure(OpBase* op, float base)
+{
+  numMeasured ++;
+  int outputSize = 1;
+  for (int i = 0; i < op->outputs[0].numDim; i++)
+    outputSize *= op->outputs[0].dim[i];
+  op->runtime = base + outputSize * 1e-5f;
+}
+
+void Model::measure_conv2d_cost(Conv2D* op) { stub_measure(op, 1.0f); }
+void Model::measure_matmul_cost(Matmul* op) { stub_measure(op, 1.0f); }
+void Model::measure_pool2d_cost(Pool2D* op) { stub_measure(op, 0.5f); }
+void Model::measure_activation_cost(Activation* op) { stub_measure(op, 0.3f); }
+void Model::measure_batchnorm_cost(BatchNorm* op) { stub_measure(op, 0.3f); }
+void Model::measure_concat_cost(Concat* op) { stub_measure(op, 0.1f); }
+void Model::measure_element_cost(Element* op) { stub_measure(op, 0.2f); }
+
+void* Model::allocate_memory(size_t size) { return NULL; }
+
+float Model::measure_oplist_runtime(const std::vector<OpBase*>& list)
+{
+  float total = 0.0f;
+  for (size_t i = 0; i < list.size(); i++)
+    total += list[i]->runtime;
+  return total;
+}
+
+#define STUB_KERNELS(OP) \
+  void OP::map(void) {} void OP::unmap(void) {} void OP::forward(void) {}
+STUB_KERNELS(Conv2D)
+STUB_KERNELS(Matmul)
+STUB_KERNELS(Pool2D)
+STUB_KERNELS(Activation)
+STUB_KERNELS(BatchNorm)
+STUB_KERNELS(Concat)
+STUB_KERNELS(Element)
+STUB_KERNELS(NoOp)
+
+// matmul followed by relu -> matmul with a fused relu
+class FuseMatmulRelu : public DstOp {
+public:
+  FuseMatmulRelu(const SrcOp* mm) : DstOp(OpBase::OP_MATMUL, mm) {}
+  Op create_operator(Model* model)
+  {
+    Matmul* mm = (Matmul*) srcOps[0]->mapOp.ptr;
+    return model->get_or_create_matmul(mm->inputs[0], mm->outputC,
+                                       OpBase::AC_MODE_RELU);
+  }
+};
+
+GraphXfer* create_fuse_mm_acti_xfer(Model* model)
+{
+  GraphXfer* xfer = new GraphXfer(model);
+  SrcOp* mm = new SrcOp(OpBase::OP_MATMUL);
+  mm->add_constraint(COMPARE_EQ, OpBase::PM_ACTI, OpBase::AC_MODE_NONE);
+  SrcOp* relu = new SrcOp(OpBase::OP_RELU);
+  DstOp* fused = new FuseMatmulRelu(mm);
+  xfer->add_src_op(mm);
+  xfer->add_src_op(relu);
+  xfer->add_dst_op(fused);
+  xfer->add_src_edge(mm, relu);
+  xfer->map_input(mm, fused);
+  xfer->map_output(relu, fused);
+  return xfer;
+}
+
+// The remaining substitutions match nothing
+GraphXfer* create_fuse_conv_batch_xfer(Model* model) { return new GraphXfer(model); }
+GraphXfer* create_fuse_conv_relu_xfer(Model* model) { return new GraphXfer(model); }
+GraphXfer* create_merge_mm_xfer(Model* model) { return new GraphXfer(model); }
+GraphXfer* create_merge_conv_xfer(Model* model) { return new GraphXfer(model); }
+GraphXfer* create_exclusive_concat_xfer(Model* model) { return new GraphXfer(model); }
+GraphXfer* create_resnet_merge_xfer(Model* model) { return new GraphXfer(model); }
+
+// ---- helpers ----
+
+// `branches` independent matmul+relu branches over their own inputs,
+// summed; every branch can be fused on its own
+static Graph* build_mlp(Model* model, int branches)
+{
+  Graph* graph = new Graph(model);
+  Tensor input;
+  input.numDim = 3;
+  input.dim[0] = 1;
+  input.dim[1] = 4;
+  input.dim[2] = 8;
+  for (int i = 3; i < MAX_DIM; i++)
+    input.dim[i] = 0;
+  input.op.guid = 0;
+  input.op.ptr = NULL;
+  input.idx = 0;
+  input.ptr = NULL;
+  Tensor sum;
+  for (int i = 0; i < branches; i++) {
+    // A NoOp per input gives each branch its own source op
+    Tensor x = graph->noop(input);
+    Tensor h = graph->relu(graph->matmul(x, 16));
+    sum = i == 0 ? h : graph->add(sum, h);
+  }
+  return graph;
+}
+
+static int count_ops(Graph* graph, OpBase::OpType type)
+{
+  int count = 0;
+  std::map<Op, std::set<Edge, EdgeCompare>, OpCompare>::const_iterator it;
+  for (it = graph->inEdges.begin(); it != graph->inEdges.end(); it++)
+    if (it->first.ptr != NULL && it->first.ptr->type == type) count ++;
+  return count;
+}
+
+static std::string temp_file_name(void)
+{
+  char name[] = "/tmp/search_test_XXXXXX";
+  int fd = mkstemp(name);
+  CHECK(fd >= 0);
+  close(fd);
+  return name;
+}
+
+// ---- tests ----
+
+static void test_cost_table_round_trip(void)
+{
+  std::string file_name = temp_file_name();
+  Model first(false);
+  Graph* graph = build_mlp(&first, 2);
+  graph->build_out_edges();
+  int measured = numMeasured;
+  CHECK(measured > 0);
+  CHECK(first.costHits == 0);
+  first.save_cost_table(file_name);
+
+  Model second(false);
+  CHECK(second.load_cost_table(file_name));
+  Graph* reloaded = build_mlp(&second, 2);
+  reloaded->build_out_edges();
+  CHECK(numMeasured == measured);
+  CHECK(second.costMisses == 0);
+  CHECK(second.costHits == first.costMisses);
+  CHECK(reloaded->total_cost() == graph->total_cost());
+
+  // Costs measured for inference are not reused for training
+  Model training(true);
+  CHECK(training.load_cost_table(file_name));
+  delete build_mlp(&training, 2);
+  CHECK(training.costHits == 0);
+  CHECK(numMeasured > measured);
+
+  delete graph;
+  delete reloaded;
+  unlink(file_name.c_str());
+}
+
+static void test_cost_table_malformed(void)
+{
+  std::string file_name = temp_file_name();
+  FILE* file = fopen(file_name.c_str(), "w");
+  fprintf(file, "3 %d 0 7 1.5 -1\n", (int) OpBase::OP_NOOP);
+  fprintf(file, "-4 1 2 3\n");
+  fprintf(file, "3 %d 0 9 2.5 -1\n", (int) OpBase::OP_NOOP);
+  fclose(file);
+  Model model(false);
+  CHECK(model.load_cost_table(file_name));
+  CHECK(model.costTable.size() == 1);
+  CHECK(!model.load_cost_table(file_name + ".missing"));
+  unlink(file_name.c_str());
+}
+
+static void test_search(void)
+{
+  const int branches = 3;
+  float bestCost[2];
+  int threads[2] = {1, 4};
+  for (int i = 0; i < 2; i++) {
+    Model model(false);
+    Graph* graph = build_mlp(&model, branches);
+    graph->build_out_edges();
+    SearchStats stats;
+    Graph* best = optimize_graph(graph, &model, 1.05f, 0, threads[i], &stats);
+    CHECK(best->check_correctness());
+    CHECK(count_ops(best, OpBase::OP_RELU) == 0);
+    CHECK(count_ops(best, OpBase::OP_MATMUL) == branches);
+    CHECK(stats.bestCost < stats.baselineCost);
+    CHECK(stats.bestCost == best->total_cost());
+    CHECK(stats.graphsExplored > 0);
+    CHECK(stats.graphsGenerated >= stats.graphsDuplicated);
+    // Fusing the branches in different orders reaches the same graphs
+    CHECK(stats.graphsDuplicated > 0);
+    CHECK(stats.opHits > 0);
+    bestCost[i] = stats.bestCost;
+    delete best;
+  }
+  CHECK(bestCost[0] == bestCost[1]);
+}
+
+static void test_search_budget(void)
+{
+  Model model(false);
+  Graph* graph = build_mlp(&model, 3);
+  graph->build_out_edges();
+  SearchStats stats;
+  Graph* best = optimize_graph(graph, &model, 1.05f, 2, 2, &stats);
+  CHECK(stats.graphsExplored == 2);
+  CHECK(best->check_correctness());
+  delete best;
+}
+
+int main(void)
+{
+  test_cost_table_round_trip();
+  test_cost_table_malformed();
+  test_search();
+  test_search_budget();
+  printf("search_test: all tests passed\n");
+  return 0;
+}
@@ -1,9 +1,9 @@
+from __future__ import print_function, absolute_import
+
 import numpy as np
 import tvm
 import topi
 
-from __future__ import print_function, absolute_import
-
 def reduce_sum_axis_zero(shape, func_name, dtype="float32", tgt="llvm", tgt_host="llvm"):
     A = tvm.te.placeholder(shape, dtype=dtype, name="A")
     C = topi.sum(A, axis=0, keepdims=False)
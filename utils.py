@@ -3,8 +3,6 @@ from operator import add
 from functools import reduce
 import numpy as np
 
-from node import Placeholder, OnesLikeOp
-
 def sum_nodes(nodes):
     return reduce(add, nodes)
 
@@ -15,7 +13,8 @@ def softmax_fn(y):
     return softmax
 
 def var(desc):
-    pn = Placeholder()
+    from node import Placeholder # node imports utils, so import lazily
+    pn = Placeholder()()
     pn.desc = desc
     return pn
 
@@ -35,6 +34,7 @@ def topological_sort_lookup(nodes):
     return order
 
 def gradients(node, node_list):
+    from node import OnesLikeOp
     node_to_grad = dict()
     temp = OnesLikeOp()
     reverse_topo = reversed(topological_sort_lookup([node]))